@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import tempfile
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    def __init__(self, cache_dir: str = "storage/cache", memory_size: int = 128):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        
+        # Recently used entries are kept in memory (LRU) so repeat lookups skip disk
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        """Get the file path for a cache entry"""
+        return self.cache_dir / namespace / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired"""
+        memory_key = (namespace, key)
+        entry = self._memory.get(memory_key)
+        if entry is not None:
+            expires_at, value = entry
+            if not expires_at or expires_at >= time.time():
+                self._memory.move_to_end(memory_key)
+                self.hits += 1
+                return value
+            del self._memory[memory_key]
+        
+        path = self._path(namespace, key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            expires_at = entry.get("expires_at")
+            value = entry["value"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            self.misses += 1
+            return None
+
+        if expires_at and expires_at < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+
+        self._remember(memory_key, expires_at, value)
+        self.hits += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value, optionally expiring after ttl seconds.
+        Failures are reported but never raised, since a missing entry only costs a recompute"""
+        path = self._path(namespace, key)
+        entry = {
+            "expires_at": time.time() + ttl if ttl else None,
+            "value": value
+        }
+        self._remember((namespace, key), entry["expires_at"], value)
+
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not write cache entry %s/%s: %s", namespace, key, e)
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _remember(self, memory_key: Tuple[str, str], expires_at: Optional[float], value: Any):
+        """Keep an entry in the in-memory LRU, evicting the least recently used"""
+        if self.memory_size <= 0:
+            return
+        self._memory[memory_key] = (expires_at, value)
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counts for this process"""
+        return {"hits": self.hits, "misses": self.misses}
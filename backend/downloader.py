@@ -0,0 +1,77 @@
+import os
+import copy
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import yt_dlp
+
+# This module runs inside the download worker processes, so it must stay free of
+# heavy imports (whisper, torch) and only exchange plain, picklable data
+
+YDL_OPTIONS = {
+    'merge_output_format': 'mp4',
+    'quiet': True,
+    'no_warnings': True,
+    # Fetch DASH/HLS fragments in parallel and request plain HTTP downloads in
+    # 10 MB chunks so per-connection throttling does not cap throughput
+    'concurrent_fragment_downloads': int(os.getenv("YTDL_CONCURRENT_FRAGMENTS", "5")),
+    'http_chunk_size': 10 * 1024 * 1024,
+    # Fail a stalled connection after 15s and retry a bounded number of times,
+    # instead of hanging a worker on yt-dlp's default of no socket timeout
+    'socket_timeout': 15,
+    'retries': 3,
+    'fragment_retries': 3,
+    'noprogress': True,
+    # Whatever yt-dlp still reports goes through logging rather than straight to stdout
+    'logger': logging.getLogger("yt_dlp")
+}
+VIDEO_FORMAT = 'bestvideo[height<=720]+bestaudio/best[height<=720]'  # Limit to 720p for faster processing
+AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio/best'  # Whisper only needs the audio track
+
+# One YoutubeDL per format, built once per worker process so extractors and options
+# are not reloaded for every download
+_youtube_dls: Dict[str, yt_dlp.YoutubeDL] = {}
+
+
+def init_worker():
+    """Configure logging in a download worker process the same way main.py does for the server"""
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+
+
+def _get_youtube_dl(fmt: str) -> yt_dlp.YoutubeDL:
+    """Get this process's YoutubeDL instance for a format selector"""
+    if fmt not in _youtube_dls:
+        _youtube_dls[fmt] = yt_dlp.YoutubeDL(dict(YDL_OPTIONS, format=fmt))
+    return _youtube_dls[fmt]
+
+
+def download(youtube_url: str, fmt: str, outtmpl: str,
+             ie_result: Optional[Dict[str, Any]] = None,
+             ranges: Optional[List[Tuple[float, float]]] = None) -> Dict[str, Any]:
+    """Download a video (or only the given sections of it) in a format.
+
+    Metadata extracted by an earlier call can be passed back in as ie_result so
+    YouTube is only queried once per job; it is returned when freshly extracted."""
+    ydl = _get_youtube_dl(fmt)
+    ydl.params['outtmpl']['default'] = outtmpl
+    if ranges is not None:
+        ydl.params['download_ranges'] = yt_dlp.utils.download_range_func(None, ranges)
+
+    extracted = None
+    try:
+        if ie_result is None:
+            ie_result = extracted = ydl.extract_info(youtube_url, download=False, process=False)
+        # Format selection mutates the info dict, so the download gets its own copy
+        info = ydl.process_ie_result(copy.deepcopy(ie_result), download=True)
+    except yt_dlp.utils.YoutubeDLError as e:
+        # yt-dlp errors keep the original traceback, which cannot be pickled back
+        # to the parent; pass on just the message (e.g. why a video is unavailable)
+        raise RuntimeError(str(e)) from None
+    finally:
+        ydl.params.pop('download_ranges', None)
+
+    return {
+        "ie_result": extracted,
+        "duration": info.get('duration'),
+        "filepaths": [d.get('filepath') for d in info.get('requested_downloads') or []]
+    }
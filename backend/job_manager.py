@@ -1,11 +1,18 @@
 import os
 import json
 import shutil
+import hashlib
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import tempfile
 
+# Number of jobs processed at once; further jobs wait in the queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Fields that change on every progress tick and need not be persisted immediately
+PROGRESS_FIELDS = {"progress", "current_step"}
+
 class JobManager:
     def __init__(self, storage_dir: str = "storage"):
         self.storage_dir = Path(storage_dir)
@@ -18,6 +25,10 @@ class JobManager:
         
         # Load existing jobs
         self.jobs: Dict[str, Dict[str, Any]] = self._load_jobs()
+        
+        # Pipelines queued or running, keyed by URL + instructions, so identical
+        # jobs share one run instead of repeating it
+        self._inflight: Dict[str, Dict[str, Any]] = {}
     
     def _load_jobs(self) -> Dict[str, Dict[str, Any]]:
         """Load jobs from JSON file"""
@@ -60,12 +71,52 @@ class JobManager:
         """Get a specific job by ID"""
         return self.jobs.get(job_id)
     
-    def update_job(self, job_id: str, updates: Dict[str, Any]):
-        """Update a job with new data"""
-        if job_id in self.jobs:
-            self.jobs[job_id].update(updates)
-            self.jobs[job_id]["updated_at"] = datetime.now().isoformat()
-            self._save_jobs()
+    def update_job(self, job_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a job with new data and return the updated job"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.update(updates)
+            job["updated_at"] = datetime.now().isoformat()
+            # Progress ticks are only interesting while the process is alive, so
+            # skip rewriting the jobs file for them; the next status change saves them
+            if not updates.keys() <= PROGRESS_FIELDS:
+                self._save_jobs()
+        return job
+    
+    @staticmethod
+    def pipeline_key(youtube_url: str, instructions: str = "") -> str:
+        """Get the key identifying jobs that would produce the same output"""
+        return hashlib.sha256(f"{youtube_url}|{instructions}".encode()).hexdigest()
+    
+    def join_pipeline(self, key: str, job_id: str) -> bool:
+        """Attach a job to the identical pipeline already submitted, or start a new
+        one; return True when the caller should run the new pipeline"""
+        pipeline = self._inflight.get(key)
+        if pipeline is not None:
+            pipeline["job_ids"].append(job_id)
+            return False
+        
+        self._inflight[key] = {"job_ids": [job_id]}
+        return True
+    
+    def pipeline_job_ids(self, key: str) -> List[str]:
+        """Get the IDs of all jobs sharing an in-flight pipeline"""
+        pipeline = self._inflight.get(key)
+        return list(pipeline["job_ids"]) if pipeline else []
+    
+    def finish_pipeline(self, key: str) -> List[str]:
+        """Close an in-flight pipeline and return the IDs of every job that shared it"""
+        pipeline = self._inflight.pop(key, None)
+        return pipeline["job_ids"] if pipeline else []
+    
+    def share_video(self, video_path: str, job_id: str) -> str:
+        """Give a job its own link to a video produced by another job and return the new path"""
+        shared_path = self.videos_dir / f"{job_id}.mp4"
+        try:
+            os.link(video_path, shared_path)
+        except OSError:
+            shutil.copyfile(video_path, shared_path)
+        return str(shared_path)
     
     def list_jobs(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all jobs, optionally filtered by user"""
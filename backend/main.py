@@ -1,13 +1,15 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import asyncio
-import json
+import orjson
 import uuid
 import os
+import time
 import tempfile
+import logging
 from datetime import datetime
 import aiofiles
 from pathlib import Path
@@ -16,10 +18,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Quiet by default; set LOG_LEVEL=INFO or DEBUG for pipeline detail
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
+
 from video_processor import VideoProcessor
-from job_manager import JobManager
+from job_manager import JOB_WORKERS, JobManager
 
-app = FastAPI(title="ClipWave AI Backend", version="1.0.0")
+app = FastAPI(title="ClipWave AI Backend", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -37,39 +43,128 @@ app.add_middleware(
 # Initialize job manager
 job_manager = JobManager()
 
+# Minimum seconds between progress broadcasts for a job
+PROGRESS_BROADCAST_INTERVAL = 0.2
+
+# WebSocket sends issued together before yielding to the event loop
+PUBLISH_BATCH_SIZE = 50
+
+# Internal Nginx location mapped to storage/videos, e.g. "/_internal/videos"
+ACCEL_REDIRECT_PREFIX = os.getenv("VIDEO_ACCEL_REDIRECT_PREFIX", "").rstrip("/")
+
+class VideoFileResponse(FileResponse):
+    # Larger reads mean far fewer event-loop round trips for multi-hundred-MB videos
+    chunk_size = 1024 * 1024
+
+def job_update_message(job_id: str, job: Optional[Dict[str, Any]]) -> str:
+    """Serialize a job update for WebSocket clients"""
+    return orjson.dumps({
+        "type": "job_update",
+        "job_id": job_id,
+        "data": job
+    }).decode()
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Subscribers indexed by the job they are watching
+        self.subscribers: Dict[str, Set[WebSocket]] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, job_id: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.subscribers.setdefault(job_id, set()).add(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    def disconnect(self, websocket: WebSocket, job_id: str):
+        connections = self.subscribers.get(job_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.subscribers[job_id]
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        dead_connections = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"Failed to send message to WebSocket: {e}")
-                dead_connections.append(connection)
+    async def publish(self, job_id: str, message: str):
+        """Send a message to every client watching a job without one slow client blocking the rest"""
+        connections = list(self.subscribers.get(job_id, ()))
+        if not connections:
+            return
         
-        # Remove dead connections
-        for dead_connection in dead_connections:
-            try:
-                self.active_connections.remove(dead_connection)
-            except ValueError:
-                pass  # Connection already removed
+        # Send in batches, yielding between them so a large audience cannot
+        # hold the event loop for the whole fan-out
+        dead_connections = set()
+        for i in range(0, len(connections), PUBLISH_BATCH_SIZE):
+            batch = connections[i:i + PUBLISH_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(connection.send_text(message) for connection in batch),
+                return_exceptions=True
+            )
+            for connection, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.debug("Failed to send message to WebSocket: %s", result)
+                    dead_connections.add(connection)
+            if i + PUBLISH_BATCH_SIZE < len(connections):
+                await asyncio.sleep(0)
+        
+        # Remove dead connections in one set difference; the snapshot above means
+        # sockets that joined during the sends are untouched, so no lock is needed
+        subscribers = self.subscribers.get(job_id)
+        if dead_connections and subscribers is not None:
+            subscribers -= dead_connections
+            if not subscribers:
+                del self.subscribers[job_id]
 
 manager = ConnectionManager()
 
+# Job queue drained by a fixed pool of workers, created on startup
+job_queue: Optional[asyncio.Queue] = None
+job_workers: List[asyncio.Task] = []
+
+async def job_worker():
+    """Process queued pipelines one at a time"""
+    while True:
+        pipeline_key = await job_queue.get()
+        try:
+            await process_pipeline(pipeline_key)
+        except Exception as e:
+            logger.exception("Worker failed on pipeline %s: %s", pipeline_key, e)
+        finally:
+            job_queue.task_done()
+
+@app.on_event("startup")
+async def start_job_workers():
+    global job_queue
+    job_queue = asyncio.Queue()
+    for _ in range(JOB_WORKERS):
+        job_workers.append(asyncio.create_task(job_worker()))
+    
+    # Pick up jobs that were still waiting when the server last stopped
+    for job in reversed(job_manager.list_jobs()):
+        if job["status"] == "queued":
+            submit_job(job)
+
+def submit_job(job: Dict[str, Any]):
+    """Queue a job's pipeline, or attach the job to an identical pipeline already
+    submitted so it finishes with that run without holding a job worker"""
+    pipeline_key = job_manager.pipeline_key(job["youtube_url"], job["instructions"])
+    if job_manager.join_pipeline(pipeline_key, job["id"]):
+        job_queue.put_nowait(pipeline_key)
+        return
+    
+    # Start from the pipeline's current state; its progress updates reach this job from now on
+    leader = job_manager.get_job(job_manager.pipeline_job_ids(pipeline_key)[0])
+    if leader is not None:
+        job_manager.update_job(job["id"], {
+            "status": leader["status"],
+            "progress": leader["progress"],
+            "current_step": leader["current_step"]
+        })
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    for worker in job_workers:
+        worker.cancel()
+
 # Pydantic models
 class VideoRequest(BaseModel):
     youtube_url: str
@@ -89,12 +184,15 @@ class JobStatus(BaseModel):
     error: Optional[str] = None
     video_url: Optional[str] = None
 
+# The root payload never changes, so serialize it once at import
+ROOT_BODY = orjson.dumps({"message": "ClipWave AI Backend is running"})
+
 @app.get("/")
 async def root():
-    return {"message": "ClipWave AI Backend is running"}
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 @app.post("/api/jobs", response_model=JobResponse)
-async def create_job(request: VideoRequest, background_tasks: BackgroundTasks):
+async def create_job(request: VideoRequest):
     """Create a new video processing job"""
     try:
         job_id = str(uuid.uuid4())
@@ -107,8 +205,8 @@ async def create_job(request: VideoRequest, background_tasks: BackgroundTasks):
             user_id=request.user_id
         )
         
-        # Start processing in background
-        background_tasks.add_task(process_video_job, job_id)
+        # Queue for the job workers, or share the run of an identical job already submitted
+        submit_job(job)
         
         return JobResponse(
             job_id=job_id,
@@ -172,11 +270,26 @@ async def download_video(job_id: str, user_id: Optional[str] = None):
         raise HTTPException(status_code=403, detail="Access denied")
     
     video_path = job.get("video_path")
-    if not video_path or not os.path.exists(video_path):
+    try:
+        stat_result = os.stat(video_path) if video_path else None
+    except OSError:
+        stat_result = None
+    if not stat_result:
         raise HTTPException(status_code=404, detail="Video file not found")
     
-    return FileResponse(
+    # Behind Nginx, hand the transfer to the proxy's sendfile path
+    if ACCEL_REDIRECT_PREFIX:
+        return Response(
+            media_type="video/mp4",
+            headers={
+                "X-Accel-Redirect": f"{ACCEL_REDIRECT_PREFIX}/{os.path.basename(video_path)}",
+                "Content-Disposition": f'attachment; filename="clip_{job_id}.mp4"'
+            }
+        )
+    
+    return VideoFileResponse(
         video_path,
+        stat_result=stat_result,
         media_type="video/mp4",
         filename=f"clip_{job_id}.mp4"
     )
@@ -184,116 +297,149 @@ async def download_video(job_id: str, user_id: Optional[str] = None):
 @app.websocket("/ws/{job_id}")
 async def websocket_endpoint(websocket: WebSocket, job_id: str):
     """WebSocket endpoint for real-time job updates"""
-    await manager.connect(websocket)
+    await manager.connect(websocket, job_id)
     try:
         # Send initial status
         job = job_manager.get_job(job_id)
         if job:
             try:
-                await manager.send_personal_message(
-                    json.dumps({
-                        "type": "job_update",
-                        "job_id": job_id,
-                        "data": job
-                    }),
-                    websocket
-                )
+                await manager.send_personal_message(job_update_message(job_id, job), websocket)
             except Exception as e:
-                print(f"Error sending initial status: {e}")
+                logger.debug("Error sending initial status: %s", e)
                 return
         
-        # Keep connection alive and wait for updates
+        # Updates are pushed by publish(); keepalive is handled by the server's
+        # protocol-level pings, so only read to notice when the client goes away
         while True:
             try:
-                # Wait for any message from client (ping/pong)
-                data = await websocket.receive_text()
-                # Echo back to keep connection alive
-                await websocket.send_text(data)
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
             except WebSocketDisconnect:
                 break
             except Exception as e:
-                print(f"WebSocket error: {e}")
+                logger.debug("WebSocket error: %s", e)
                 break
     except WebSocketDisconnect:
         pass
     finally:
-        manager.disconnect(websocket)
+        manager.disconnect(websocket, job_id)
 
-async def process_video_job(job_id: str):
-    """Background task to process video jobs"""
-    try:
+async def process_pipeline(pipeline_key: str):
+    """Background task to run a pipeline once for every identical job sharing it"""
+    # The first job that still exists runs the pipeline; jobs deleted while
+    # queued simply drop out instead of failing the others
+    job = None
+    for job_id in job_manager.pipeline_job_ids(pipeline_key):
         job = job_manager.get_job(job_id)
-        if not job:
-            return
-        
-        # Update status to processing
-        job_manager.update_job(job_id, {
-            "status": "processing",
-            "progress": 0,
-            "current_step": "Initializing..."
-        })
-        
-        # Initialize video processor
-        processor = VideoProcessor(job_id)
-        
-        # Process the video with progress callbacks
-        def progress_callback(progress: int, step: str):
+        if job is not None:
+            break
+    if job is None:
+        job_manager.finish_pipeline(pipeline_key)
+        return
+    
+    try:
+        # Update status to processing, for every identical job waiting on this one too
+        for job_id in job_manager.pipeline_job_ids(pipeline_key):
+            job_manager.update_job(job_id, {
+                "status": "processing",
+                "progress": 0,
+                "current_step": "Initializing..."
+            })
+        result = await run_pipeline(job, pipeline_key)
+    except Exception as e:
+        for job_id in job_manager.finish_pipeline(pipeline_key):
+            fail_job(job_id, e)
+        return
+    
+    # Give every other job still present its own link to the video before the
+    # running job is completed (or its video removed, if it was deleted meanwhile)
+    for job_id in job_manager.finish_pipeline(pipeline_key):
+        if job_id == job["id"] or job_manager.get_job(job_id) is None:
+            continue
+        try:
+            complete_job(job_id, result, job_manager.share_video(result["video_path"], job_id))
+        except Exception as e:
+            fail_job(job_id, e)
+    complete_job(job["id"], result, result["video_path"])
+
+def complete_job(job_id: str, result: Dict[str, Any], video_path: str):
+    """Store a job's results and broadcast its completion"""
+    if job_manager.get_job(job_id) is None:
+        # Deleted while processing; nothing would ever serve or clean up the video
+        try:
+            os.remove(video_path)
+        except OSError:
+            pass
+        return
+    
+    job = job_manager.update_job(job_id, {
+        "status": "completed",
+        "progress": 100,
+        "current_step": "Completed",
+        "video_path": video_path,
+        "video_url": f"/api/videos/{job_id}",
+        "clips": result.get("clips", [])
+    })
+    asyncio.create_task(manager.publish(job_id, job_update_message(job_id, job)))
+
+def fail_job(job_id: str, error: Exception):
+    """Mark a job as failed and broadcast the error"""
+    job = job_manager.update_job(job_id, {
+        "status": "failed",
+        "error": str(error),
+        "current_step": "Failed"
+    })
+    asyncio.create_task(manager.publish(job_id, job_update_message(job_id, job)))
+
+async def run_pipeline(job: Dict[str, Any], pipeline_key: str) -> Dict[str, Any]:
+    """Run the video pipeline for a job, reporting progress to every job sharing it"""
+    # Initialize video processor
+    processor = VideoProcessor(job["id"])
+    
+    # Progress updates are always stored, but broadcasts are coalesced to at
+    # most one per PROGRESS_BROADCAST_INTERVAL; a trailing send delivers the latest state
+    last_sent = 0.0
+    pending_send: Optional[asyncio.TimerHandle] = None
+    
+    def send_update():
+        nonlocal last_sent, pending_send
+        last_sent = time.monotonic()
+        pending_send = None
+        # Broadcast update to WebSocket clients
+        for job_id in job_manager.pipeline_job_ids(pipeline_key):
+            asyncio.create_task(manager.publish(
+                job_id, job_update_message(job_id, job_manager.get_job(job_id))
+            ))
+    
+    # Process the video with progress callbacks
+    def progress_callback(progress: int, step: str):
+        nonlocal pending_send
+        for job_id in job_manager.pipeline_job_ids(pipeline_key):
             job_manager.update_job(job_id, {
                 "progress": progress,
                 "current_step": step
             })
-            # Broadcast update to WebSocket clients
-            asyncio.create_task(manager.broadcast(
-                json.dumps({
-                    "type": "job_update",
-                    "job_id": job_id,
-                    "data": job_manager.get_job(job_id)
-                })
-            ))
-        
-        # Process the video
-        result = await processor.process_video(
+        if pending_send is not None:
+            return
+        wait = PROGRESS_BROADCAST_INTERVAL - (time.monotonic() - last_sent)
+        if progress >= 100 or wait <= 0:
+            send_update()
+        else:
+            pending_send = asyncio.get_running_loop().call_later(wait, send_update)
+    
+    # Process the video
+    try:
+        return await processor.process_video(
             youtube_url=job["youtube_url"],
             instructions=job["instructions"],
             progress_callback=progress_callback
         )
-        
-        # Update job with results
-        job_manager.update_job(job_id, {
-            "status": "completed",
-            "progress": 100,
-            "current_step": "Completed",
-            "video_path": result["video_path"],
-            "video_url": f"/api/videos/{job_id}",
-            "clips": result.get("clips", [])
-        })
-        
-        # Broadcast completion
-        asyncio.create_task(manager.broadcast(
-            json.dumps({
-                "type": "job_update",
-                "job_id": job_id,
-                "data": job_manager.get_job(job_id)
-            })
-        ))
-        
-    except Exception as e:
-        # Update job with error
-        job_manager.update_job(job_id, {
-            "status": "failed",
-            "error": str(e),
-            "current_step": "Failed"
-        })
-        
-        # Broadcast error
-        asyncio.create_task(manager.broadcast(
-            json.dumps({
-                "type": "job_update",
-                "job_id": job_id,
-                "data": job_manager.get_job(job_id)
-            })
-        ))
+    finally:
+        # The final status broadcast supersedes any pending progress send
+        if pending_send is not None:
+            pending_send.cancel()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, ws_ping_interval=20, ws_ping_timeout=20)
\ No newline at end of file
@@ -4,6 +4,7 @@ Test script to verify GPT analysis is working properly
 """
 
 import os
+import json
 import asyncio
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -42,13 +43,14 @@ async def test_gpt_analysis():
     print(f"🎯 Instructions: '{instructions}'")
     
     # Create the prompt (same as in video_processor.py)
+    compact_transcript = "\n".join(f"{start:.1f}-{end:.1f} {text}" for text, start, end in sample_transcript)
     prompt = f"""
-    Here is the transcript of the video: {sample_transcript}
+    Here is the transcript of the video:
+{compact_transcript}
     
     Instructions: {instructions}
     
     Please identify the most relevant time intervals in the video based on the instructions.
-    Return only the timestamps in this exact format: [{{'start': 12.4, 'end': 54.6}}, ...]
     """
     
     try:
@@ -62,21 +64,45 @@ async def test_gpt_analysis():
         
         print("🤖 Making GPT API call...")
         completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model="gpt-4o-mini",
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "clips",
+                    "strict": True,
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "clips": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "start": {"type": "number"},
+                                        "end": {"type": "number"}
+                                    },
+                                    "required": ["start", "end"],
+                                    "additionalProperties": False
+                                }
+                            }
+                        },
+                        "required": ["clips"],
+                        "additionalProperties": False
+                    }
+                }
+            },
             messages=[
                 {
                     "role": "system",
                     "content": """
 You are a precise and efficient video clipping assistant.
 
-Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request.
+Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request. Each transcript line is "start-end text", with times in seconds.
 
 Provide just enough context for the user to understand what's happening, but avoid unnecessary filler. Be decisive—separate clips only when the topic, speaker, or scene clearly shifts. Minimize the number of clips while maintaining clarity.
 
-Return only a list of timestamp dictionaries in this exact format:
-[{'start': 12.4, 'end': 54.6}, {'start': 110.2, 'end': 132.0}]
-
-Do not include any explanation or commentary—just the list of relevant timestamp ranges.
+Respond with a JSON object in this exact format:
+{"clips": [{"start": 12.4, "end": 54.6}, {"start": 110.2, "end": 132.0}]}
 """
                 },
                 {
@@ -90,14 +116,7 @@ Do not include any explanation or commentary—just the list of relevant timesta
         print(f"✅ GPT Response: {response}")
         
         # Extract timestamps
-        import re
-        import ast
-        
-        match = re.search(r"\[\s*{.*?}\s*\]", response, re.DOTALL)
-        if not match:
-            raise ValueError("No valid timestamp list found in GPT response")
-        
-        timestamps = ast.literal_eval(match.group(0))
+        timestamps = json.loads(response)["clips"]
         print(f"🎬 Extracted {len(timestamps)} timestamp ranges:")
         for i, ts in enumerate(timestamps):
             duration = ts['end'] - ts['start']
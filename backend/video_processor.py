@@ -1,20 +1,340 @@
-import yt_dlp
 import whisper
 import tempfile
 import os
 import re
-import ast
-import subprocess
+import orjson
 import asyncio
-from openai import OpenAI
-from moviepy import VideoFileClip, concatenate_videoclips
+import bisect
+import hashlib
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse, parse_qs
+from openai import AsyncOpenAI
 from typing import Callable, Optional, Dict, Any, List, Tuple
 import threading
+import logging
 import time
 from pathlib import Path
 
+from disk_cache import DiskCache
+from job_manager import JOB_WORKERS
+from downloader import AUDIO_FORMAT, VIDEO_FORMAT, download, init_worker
+
+logger = logging.getLogger(__name__)
+
+# Characters allowed in a YouTube video ID
+_VIDEO_ID_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+
+# Path prefixes that are followed directly by the video ID
+_VIDEO_ID_PATH_PREFIXES = ("/shorts/", "/embed/", "/v/")
+
+# Matches watch, shorts, embed, /v/ and youtu.be URLs in a single scan
+_VIDEO_ID_RE = re.compile(r"(?:youtube\.com/(?:watch\?v=|shorts/|embed/|v/)|youtu\.be/)([a-zA-Z0-9_-]{11})")
+
+# Blocking disk work (model loads, cache moves) gets its own pool so a
+# burst of transcriptions can never hold it up
+_io_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="video-io")
+
+# Whisper already spreads one transcription across cores, so only a few run at once
+_cpu_executor = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 4), thread_name_prefix="video-cpu")
+
+# yt-dlp (format selection, player JS deciphering, merging) holds the GIL for long
+# stretches, so it runs in worker processes. Spawned workers start from a fresh
+# interpreter, keeping torch/whisper and this process's threads out of them. Each
+# job runs one download at a time, so one worker per job worker is enough
+def _new_ydl_executor() -> ProcessPoolExecutor:
+    """Create the pool of yt-dlp worker processes"""
+    return ProcessPoolExecutor(
+        max_workers=JOB_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker
+    )
+
+
+_ydl_executor = _new_ydl_executor()
+
+
+# ffmpeg binaries are resolved on PATH once instead of on every spawn
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# Move the MP4 index to the front of final outputs so playback can start while downloading
+FASTSTART = ["-movflags", "+faststart"]
+
+# Hardware H.264 encoders to try, in order, when a clip has to be re-encoded, with the
+# matching hardware decode args (NVDEC frames stay in GPU memory for NVENC)
+HW_H264_ENCODERS = [
+    ("h264_nvenc", ["-preset", "p4", "-rc", "vbr", "-cq", "23"], ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]),
+    ("h264_videotoolbox", ["-q:v", "65"], ["-hwaccel", "videotoolbox"]),
+]
+
+# How far (seconds) a clip start may be moved back to a keyframe before the clip
+# is re-encoded instead of stream-copied
+KEYFRAME_SNAP_TOLERANCE = float(os.getenv("KEYFRAME_SNAP_TOLERANCE", "1.0"))
+
+# Loaded Whisper models not currently transcribing. A model must not run two
+# transcriptions at once (decoding installs hooks on it), so each transcription
+# takes one and puts it back, and a new one is loaded only when all are busy
+WHISPER_MODEL = "base"
+_whisper_models: List[Any] = []
+_whisper_models_lock = threading.Lock()
+
+# Whisper transcripts are cached per YouTube video ID
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 60 * 60
+_cache = DiskCache()
+
+# Full video downloads are cached per YouTube video ID, evicting the least
+# recently used files once the cache grows past VIDEO_CACHE_MAX_BYTES
+VIDEO_CACHE_DIR = Path("storage/cache/videos")
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+
+# Clip selections are cached per transcript and instructions, since the same
+# inputs produce the same prompt
+CLIPS_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Long transcripts are analysed in overlapping windows of segments
+TRANSCRIPT_WINDOW_SEGMENTS = 60
+TRANSCRIPT_WINDOW_OVERLAP = 5
+
+# At most this many window requests per job are in flight, so long videos do
+# not burst past the OpenAI rate limit
+CLIP_REQUEST_CONCURRENCY = 4
+
+# Segments shorter than this are joined with the next one before prompting
+MIN_PROMPT_SEGMENT_SECONDS = 3.0
+
+# A repeated line is folded into the previous segment only within this many seconds of it
+REPEAT_FOLD_GAP = 1.5
+
+# Above this many segments, only segments near instruction keywords are sent to GPT
+MAX_PROMPT_SEGMENTS = 240
+
+# Words are matched whole, so punctuation ("funny," or "why?") never hides a keyword
+_WORD_RE = re.compile(r"\w+")
+
+# Bracketed annotations like "[Music]" or "(applause)"; a segment with no words
+# left once they are removed (e.g. just "♪") carries nothing for GPT
+_ANNOTATION_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)")
+
+# Words too common in instructions to locate anything in a transcript
+_STOPWORDS = {
+    "about", "also", "best", "clip", "clips", "find", "from", "have", "into", "just", "moment",
+    "moments", "most", "only", "part", "parts", "show", "that", "their", "there", "them",
+    "they", "this", "video", "want", "what", "when", "where", "which", "with", "your",
+}
+
+# Above this many merged clips, an extra GPT call picks the best ones
+MAX_CLIPS = 8
+
+# Clips closer than this many seconds are joined so back-to-back cuts do not pop
+CLIP_MERGE_GAP = 0.25
+
+_CLIP_SYSTEM_PROMPT = """
+You are a precise and efficient video clipping assistant.
+
+Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request. Each transcript line is "start-end text", with times in seconds.
+
+Provide just enough context for the user to understand what's happening, but avoid unnecessary filler. Be decisive—separate clips only when the topic, speaker, or scene clearly shifts. Minimize the number of clips while maintaining clarity.
+
+Respond with a JSON object in this exact format:
+{"clips": [{"start": 12.4, "end": 54.6}, {"start": 110.2, "end": 132.0}]}
+"""
+
+
+# Small, fast model for clip selection; the task is extraction, not reasoning
+CLIP_MODEL = "gpt-4o-mini"
+
+# Structured output schema so every reply parses as {"clips": [{"start", "end"}]}
+_CLIP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "clips",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "clips": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "start": {"type": "number"},
+                            "end": {"type": "number"}
+                        },
+                        "required": ["start", "end"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["clips"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+_openai_clients: Dict[str, AsyncOpenAI] = {}
+
+
+def _get_openai_client(api_key: str) -> AsyncOpenAI:
+    """Get the process-wide OpenAI client for an API key, so every job shares one
+    connection pool and TLS sessions survive between jobs"""
+    client = _openai_clients.get(api_key)
+    if client is None:
+        client = _openai_clients[api_key] = AsyncOpenAI(api_key=api_key)
+    return client
+
+
+def _acquire_whisper_model() -> Any:
+    """Take an idle Whisper model from the pool, loading a new one if none is idle"""
+    with _whisper_models_lock:
+        if _whisper_models:
+            return _whisper_models.pop()
+    logger.info("Loading Whisper model '%s'", WHISPER_MODEL)
+    return whisper.load_model(WHISPER_MODEL)
+
+
+def _release_whisper_model(model: Any):
+    """Return a Whisper model to the pool"""
+    with _whisper_models_lock:
+        _whisper_models.append(model)
+
+
+def _release_loaded_whisper_model(future: "asyncio.Future"):
+    """Return a model to the pool once a load nobody will use has finished"""
+    if not future.cancelled() and future.exception() is None:
+        _release_whisper_model(future.result())
+
+
+def _clip_stream_map(input_index: int = 0) -> List[str]:
+    """Map exactly one video and (if present) one audio stream of an input, so every
+    clip has the same stream layout and the copy-only concat can join them"""
+    return ["-map", f"{input_index}:v:0", "-map", f"{input_index}:a:0?"]
+
+
+def _merge_intervals(timestamps: List[Dict[str, float]], gap: float = 0.0) -> List[Dict[str, float]]:
+    """Sort clips by start time and coalesce the ones that overlap or are within gap seconds"""
+    merged: List[Dict[str, float]] = []
+    for ts in sorted(timestamps, key=lambda t: t["start"]):
+        if merged and ts["start"] <= merged[-1]["end"] + gap:
+            merged[-1]["end"] = max(merged[-1]["end"], ts["end"])
+        else:
+            merged.append({"start": ts["start"], "end": ts["end"]})
+    return merged
+
+
+
+def _clean_clips(clips: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """Drop malformed or empty intervals from a model reply and clamp starts at zero"""
+    cleaned = []
+    for clip in clips:
+        try:
+            start, end = max(0.0, float(clip["start"])), float(clip["end"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if end > start:
+            cleaned.append({"start": start, "end": end})
+    return cleaned
+
+
+def _is_non_speech(text: str) -> bool:
+    """Whether a segment holds only annotations, symbols and whitespace"""
+    return not _WORD_RE.search(_ANNOTATION_RE.sub("", text))
+
+
+def _condense_transcript(transcript: List[Tuple[str, float, float]],
+                         instructions: str) -> List[Tuple[str, float, float]]:
+    """Drop segments that cannot help GPT, keeping absolute timestamps intact"""
+    segments: List[Tuple[str, float, float]] = []
+    for text, start, end in transcript:
+        if _is_non_speech(text):
+            continue
+        # Whisper can loop on a line; extend the previous segment instead of repeating
+        # it, but only when the repeat follows closely so a line said again minutes
+        # later does not stretch one segment over everything in between
+        if (segments and start - segments[-1][2] <= REPEAT_FOLD_GAP
+                and segments[-1][0].strip().lower() == text.strip().lower()):
+            segments[-1] = (segments[-1][0], segments[-1][1], end)
+            continue
+        segments.append((text, start, end))
+    if len(segments) <= MAX_PROMPT_SEGMENTS:
+        return segments
+    
+    keywords = {word for word in _WORD_RE.findall(instructions.lower()) if len(word) > 3} - _STOPWORDS
+    if not keywords:
+        return segments
+    
+    # Keep keyword hits plus one neighbour on each side for context
+    keep = set()
+    for i, (text, _, _) in enumerate(segments):
+        if not keywords.isdisjoint(_WORD_RE.findall(text.lower())):
+            keep.update((i - 1, i, i + 1))
+    if not keep:
+        return segments
+    return [segment for i, segment in enumerate(segments) if i in keep]
+
+
+def _prune_video_cache(keep: Path):
+    """Delete least recently used cached videos until the cache fits its size budget"""
+    entries = []
+    for path in VIDEO_CACHE_DIR.glob("*.mp4"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= VIDEO_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _merge_short_segments(transcript: List[Tuple[str, float, float]],
+                          min_duration: float = MIN_PROMPT_SEGMENT_SECONDS) -> List[Tuple[str, float, float]]:
+    """Join contiguous segments until each lasts at least min_duration seconds"""
+    merged: List[Tuple[str, float, float]] = []
+    for text, start, end in transcript:
+        if merged and merged[-1][2] - merged[-1][1] < min_duration and start - merged[-1][2] <= 1.0:
+            previous_text, previous_start, _ = merged[-1]
+            merged[-1] = (f"{previous_text.strip()} {text.strip()}", previous_start, end)
+        else:
+            merged.append((text, start, end))
+    return merged
+
+
+def _format_transcript(transcript: List[Tuple[str, float, float]]) -> str:
+    """Render segments as compact "start-end text" lines for the prompt"""
+    return "\n".join(f"{start:.1f}-{end:.1f} {text.strip()}" for text, start, end in transcript)
+
+
+def _transcript_excerpt(transcript: List[Tuple[str, float, float]], segment_ends: List[float],
+                        start: float, end: float) -> str:
+    """Join the text of the time-ordered transcript segments that overlap [start, end)"""
+    texts = []
+    # Binary search for the first segment ending after start, then walk forward
+    for i in range(bisect.bisect_right(segment_ends, start), len(transcript)):
+        text, segment_start, _ = transcript[i]
+        if segment_start >= end:
+            break
+        texts.append(text.strip())
+    return " ".join(texts)
+
 
 class VideoProcessor:
+    # Encoder and hardware decode args for re-encoded clips, shared by all jobs once probed
+    _encoder_args: Optional[List[str]] = None
+    _hwaccel_args: List[str] = []
+    
     def __init__(self, job_id: str, storage_dir: str = "storage/videos"):
         self.job_id = job_id
         self.storage_dir = Path(storage_dir)
@@ -22,13 +342,22 @@ class VideoProcessor:
         
         # Create temp folder for this job
         self.temp_dir = Path(tempfile.mkdtemp())
+        self.audio_path = self.temp_dir / "audio.m4a"
         self.video_path = self.temp_dir / "input.mp4"
         self.output_path = self.storage_dir / f"{job_id}.mp4"
+        # The final video is rendered next to its inputs and only moved into
+        # storage once complete, so readers never see a partial file
+        self.render_path = self.temp_dir / "output.mp4"
+        self.video_id: Optional[str] = None
+        self.video_duration: Optional[float] = None
+        # Unprocessed yt-dlp metadata, extracted once and shared by every download
+        self._ie_result: Optional[Dict[str, Any]] = None
         
         # OpenAI API key from environment variables
         self.openai_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
+        self._openai = _get_openai_client(self.openai_key)
     
     async def process_video(self, youtube_url: str, instructions: str = "", 
                           progress_callback: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
@@ -38,26 +367,56 @@ class VideoProcessor:
             if progress_callback:
                 progress_callback(progress, step)
         
+        self.video_id = self._extract_video_id(youtube_url)
+
         try:
-            # Step 1: Download video (0-25%)
-            update_progress(0, "Downloading video...")
-            await self._download_youtube_video(youtube_url, str(self.video_path))
-            update_progress(25, "Video downloaded successfully")
-            
-            # Step 2: Transcribe video (25-50%)
-            update_progress(25, "Transcribing video with AI...")
-            transcript = await self._transcribe_video(str(self.video_path))
-            update_progress(50, "Transcription completed")
+            # Step 1: Transcribe the audio track (0-40%)
+            transcript = self._get_cached_transcript()
+            if transcript is None:
+                update_progress(0, "Downloading audio...")
+                # Load the Whisper model while the audio downloads
+                model_future = asyncio.get_running_loop().run_in_executor(_io_executor, _acquire_whisper_model)
+                try:
+                    await self._download_youtube_video(youtube_url, str(self.audio_path), AUDIO_FORMAT)
+                except Exception:
+                    model_future.add_done_callback(_release_loaded_whisper_model)
+                    raise
+                update_progress(15, "Transcribing video with AI...")
+                transcript = await self._transcribe_video(str(self.audio_path), await model_future)
+            update_progress(40, "Transcription completed")
             
-            # Step 3: Process with GPT and identify clips (50-75%)
-            update_progress(50, "Analyzing content and identifying clips...")
-            print(f"Processing transcript with {len(transcript)} segments...", flush=True)
+            # Step 2: Process with GPT and identify clips (40-60%)
+            update_progress(40, "Analyzing content and identifying clips...")
+            logger.debug("Processing transcript with %d segments", len(transcript))
             timestamps = await self._identify_clips(transcript, instructions)
-            update_progress(75, "Clips identified")
+            if self.video_duration:
+                # Clips past the end of the video cannot be cut
+                timestamps = [
+                    {"start": ts["start"], "end": min(ts["end"], self.video_duration)}
+                    for ts in timestamps if ts["start"] < self.video_duration
+                ]
+            if not timestamps:
+                # Nothing to cut; stop before downloading any video
+                raise RuntimeError("No clips matched the instructions")
+            update_progress(60, "Clips identified")
+            
+            # Step 3: Download only the clip windows of the video (60-85%)
+            update_progress(60, "Downloading video clips...")
+            sections = await self._download_clip_sections(youtube_url, timestamps)
+            if sections is None:
+                update_progress(60, "Downloading full video...")
+                source_path = await self._get_full_video(youtube_url)
+            update_progress(85, "Video downloaded successfully")
             
-            # Step 4: Render final video (75-100%)
-            update_progress(75, "Rendering final video...")
-            clips_info = await self._render_video(str(self.video_path), timestamps)
+            # Step 4: Render final video (85-100%)
+            update_progress(85, "Rendering final video...")
+            if sections is None:
+                clips_info = await self._render_video(source_path, timestamps)
+            else:
+                clips_info = await self._concat_clips(sections)
+            if not self.render_path.exists():
+                raise RuntimeError("Rendering failed: no output video was produced")
+            await asyncio.get_running_loop().run_in_executor(_io_executor, self._publish_output)
             update_progress(100, "Video processing completed")
             
             # Clean up temp files
@@ -73,206 +432,530 @@ class VideoProcessor:
             self._cleanup_temp_files()
             raise e
     
-    async def _download_youtube_video(self, youtube_url: str, output_path: str):
-        """Download YouTube video"""
-        def download():
-            ydl_opts = {
-                'format': 'bestvideo[height<=720]+bestaudio/best[height<=720]',  # Limit to 720p for faster processing
-                'outtmpl': output_path,
-                'merge_output_format': 'mp4'
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([youtube_url])
+    @staticmethod
+    def _extract_video_id(youtube_url: str) -> Optional[str]:
+        """Extract the 11-character YouTube video ID from a URL"""
+        # Well-formed URLs are split by urlparse; anything unusual goes to the regex
+        try:
+            parsed = urlparse(youtube_url)
+            host = parsed.hostname or ""
+        except ValueError:
+            parsed, host = None, ""
+        
+        candidate = None
+        if host == "youtu.be":
+            candidate = parsed.path[1:12]
+        elif host == "youtube.com" or host.endswith(".youtube.com"):
+            if parsed.path == "/watch":
+                candidate = parse_qs(parsed.query).get("v", [""])[0][:11]
+            else:
+                for prefix in _VIDEO_ID_PATH_PREFIXES:
+                    if parsed.path.startswith(prefix):
+                        candidate = parsed.path[len(prefix):len(prefix) + 11]
+                        break
+        if candidate and len(candidate) == 11 and _VIDEO_ID_CHARS.issuperset(candidate):
+            return candidate
         
-        # Run download in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, download)
+        match = _VIDEO_ID_RE.search(youtube_url)
+        return match.group(1) if match else None
+    
+    async def _download_youtube_video(self, youtube_url: str, output_path: str, fmt: str):
+        """Download YouTube video (or just its audio) in the given format"""
+        await self._run_download(youtube_url, fmt, output_path)
     
-    async def _transcribe_video(self, video_path: str) -> List[Tuple[str, float, float]]:
-        """Transcribe video using Whisper"""
+    async def _run_download(self, youtube_url: str, fmt: str, outtmpl: str,
+                            ranges: Optional[List[Tuple[float, float]]] = None) -> Dict[str, Any]:
+        """Run a yt-dlp download in a worker process, extracting the video's metadata
+        from YouTube only on the first download of the job"""
+        global _ydl_executor
+        loop = asyncio.get_running_loop()
+        executor = _ydl_executor
+        try:
+            result = await loop.run_in_executor(
+                executor, download, youtube_url, fmt, outtmpl, self._ie_result, ranges
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed), which breaks the whole pool for good;
+            # replace it once for every job and retry this download on the new one
+            logger.warning("Download worker pool broke, restarting it")
+            if _ydl_executor is executor:
+                _ydl_executor = _new_ydl_executor()
+                executor.shutdown(wait=False)
+            result = await loop.run_in_executor(
+                _ydl_executor, download, youtube_url, fmt, outtmpl, self._ie_result, ranges
+            )
+        if result["ie_result"] is not None:
+            self._ie_result = result["ie_result"]
+        # yt-dlp already knows the duration, so later steps need not probe the file for it
+        if result["duration"]:
+            self.video_duration = float(result["duration"])
+        return result
+    
+    async def _get_full_video(self, youtube_url: str) -> str:
+        """Get the path of the full video, from the download cache when possible"""
+        if not self.video_id:
+            await self._download_youtube_video(youtube_url, str(self.video_path), VIDEO_FORMAT)
+            return str(self.video_path)
+        
+        cached_path = VIDEO_CACHE_DIR / f"{self.video_id}.mp4"
+        if cached_path.exists():
+            os.utime(cached_path)  # Mark as recently used
+            logger.info("Video cache hit for %s", self.video_id)
+            # The duration was recorded with the file, so rendering need not probe it
+            if self.video_duration is None:
+                self.video_duration = _cache.get("durations", self.video_id)
+            return str(cached_path)
+        
+        await self._download_youtube_video(youtube_url, str(self.video_path), VIDEO_FORMAT)
+        
+        def store():
+            # Move next to the cache entry first so other jobs never see a partial file
+            VIDEO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            partial_path = cached_path.with_suffix(f".{self.job_id}.part")
+            shutil.move(str(self.video_path), partial_path)
+            os.replace(partial_path, cached_path)
+            _prune_video_cache(keep=cached_path)
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_io_executor, store)
+        if self.video_duration:
+            _cache.set("durations", self.video_id, self.video_duration)
+        return str(cached_path)
+    
+    async def _download_clip_sections(self, youtube_url: str,
+                                      timestamps: List[Dict[str, float]]) -> Optional[List[Tuple[Path, float, float]]]:
+        """Download only the clip windows of the video, one file per clip, or None if that fails"""
+        ranges = [
+            (max(0, ts['start']), ts['end'])
+            for ts in timestamps if ts['end'] > max(0, ts['start'])
+        ]
+        
+        try:
+            result = await self._run_download(
+                youtube_url, VIDEO_FORMAT, str(self.temp_dir / "section_%(section_start)s.%(ext)s"), ranges
+            )
+            paths = [Path(filepath) for filepath in result["filepaths"] if filepath]
+            if len(paths) != len(ranges) or not all(path.exists() for path in paths):
+                raise ValueError(f"Expected {len(ranges)} sections, got {len(paths)}")
+            
+            video_duration = result["duration"]
+            return [
+                (path, start, min(end, video_duration) if video_duration else end)
+                for path, (start, end) in zip(paths, ranges)
+            ]
+        except Exception as e:
+            logger.warning("Section download failed, falling back to full download: %s", e)
+            return None
+    
+    def _get_cached_transcript(self) -> Optional[List[Tuple[str, float, float]]]:
+        """Get a previously computed transcript for this video, if any"""
+        if not self.video_id:
+            return None
+        cached = _cache.get("transcripts", self.video_id)
+        if cached is None:
+            return None
+        logger.info("Transcript cache hit for %s (%s)", self.video_id, _cache.stats())
+        return [tuple(segment) for segment in cached]
+    
+    async def _transcribe_video(self, video_path: str, model: Any) -> List[Tuple[str, float, float]]:
+        """Transcribe video with a Whisper model from the pool, returning the model to
+        the pool afterwards, and cache the transcript for this video"""
         def transcribe():
             start_time = time.time()
             try:
-                print("Starting Whisper transcription...", flush=True)
-                model = whisper.load_model("base")
-                print("Model loaded.", flush=True)
+                logger.debug("Starting Whisper transcription")
                 result = model.transcribe(video_path, language="en")
-                print("Whisper transcription complete.", flush=True)
-                ...
+                logger.debug("Whisper transcription complete")
             except Exception as e:
-                print(f"Transcription failed: {e}", flush=True)
+                logger.error("Transcription failed: %s", e)
                 raise
+            finally:
+                _release_whisper_model(model)
             
             transcript = []
             for segment in result['segments']:
                 transcript.append((segment['text'], segment['start'], segment['end']))
             
             end_time = time.time()
-            print("transcription took" + str(end_time - start_time) + "seconds")
-            print(transcript)
+            logger.info("Transcription took %.1f seconds", end_time - start_time)
+            logger.debug("Transcript: %s", transcript)
             return transcript
         
         # Run transcription in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, transcribe)
+        loop = asyncio.get_running_loop()
+        transcript = await loop.run_in_executor(_cpu_executor, transcribe)
+        if self.video_id:
+            _cache.set("transcripts", self.video_id, transcript, ttl=TRANSCRIPT_CACHE_TTL)
+            logger.debug("Cached transcript for %s (%s)", self.video_id, _cache.stats())
+        return transcript
     
     async def _identify_clips(self, transcript: List[Tuple[str, float, float]], instructions: str) -> List[Dict[str, float]]:
-        """Use GPT to identify relevant clips"""
-        def process_with_gpt():
-            user_prompt = instructions if instructions else "Find the most engaging and important moments in this video"
-            
-            print(f"GPT Analysis - User Instructions: '{user_prompt}'", flush=True)
-            print(f"GPT Analysis - Transcript segments: {len(transcript)}", flush=True)
-            
-            prompt = f"""
-            Here is the transcript of the video: {transcript}
-            
-            Instructions: {user_prompt}
-            
-            Please identify the most relevant time intervals in the video based on the instructions.
-            Return only the timestamps in this exact format: [{{'start': 12.4, 'end': 54.6}}, ...]
-            """
-            
-            print("Starting GPT API call...", flush=True)
-            client = OpenAI(api_key=self.openai_key)
-            completion = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """
-You are a precise and efficient video clipping assistant.
-
-Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request.
-
-Provide just enough context for the user to understand what's happening, but avoid unnecessary filler. Be decisive—separate clips only when the topic, speaker, or scene clearly shifts. Minimize the number of clips while maintaining clarity.
-
-Return only a list of timestamp dictionaries in this exact format:
-[{'start': 12.4, 'end': 54.6}, {'start': 110.2, 'end': 132.0}]
-
-Do not include any explanation or commentary—just the list of relevant timestamp ranges.
-"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
-            
-            print("GPT RESPONSE:", completion.choices[0].message.content, flush=True)
-            
-            # Extract timestamps
-            match = re.search(r"\[\s*{.*?}\s*\]", completion.choices[0].message.content, re.DOTALL)
-            if not match:
-                raise ValueError("No valid timestamp list found in GPT response")
-            
-            timestamps = ast.literal_eval(match.group(0))
-            print(f"GPT Analysis - Extracted {len(timestamps)} timestamp ranges:", flush=True)
-            for i, ts in enumerate(timestamps):
-                print(f"  Clip {i+1}: {ts['start']:.1f}s - {ts['end']:.1f}s (duration: {ts['end'] - ts['start']:.1f}s)", flush=True)
-            
-            return timestamps
+        """Use GPT to identify relevant clips, fanning out over transcript windows"""
+        user_prompt = instructions if instructions else "Find the most engaging and important moments in this video"
+        # The model is part of the key so switching models never serves its predecessor's picks
+        cache_key = hashlib.blake2b(
+            orjson.dumps([CLIP_MODEL, self.video_id, transcript, user_prompt]), digest_size=16
+        ).hexdigest()
+        cached = _cache.get("clips", cache_key)
+        if cached is not None:
+            logger.info("Clip cache hit (%s)", _cache.stats())
+            return cached
+        
+        condensed = _merge_short_segments(_condense_transcript(transcript, instructions))
+        windows = self._split_transcript(condensed)
+        
+        logger.debug("GPT Analysis - User Instructions: '%s'", user_prompt)
+        logger.debug("GPT Analysis - Transcript segments: %d of %d in %d window(s)",
+                     len(condensed), len(transcript), len(windows))
+        
+        # Map: ask for clips in every window concurrently
+        semaphore = asyncio.Semaphore(CLIP_REQUEST_CONCURRENCY)
+        
+        async def request_clips(window: List[Tuple[str, float, float]]) -> List[Dict[str, float]]:
+            async with semaphore:
+                return await self._request_clips(window, user_prompt)
+        
+        results = await asyncio.gather(*(request_clips(window) for window in windows))
+        
+        # Reduce: windows overlap, so coalesce clips that were reported twice
+        timestamps = _merge_intervals([ts for clips in results for ts in clips], gap=CLIP_MERGE_GAP)
+        if len(timestamps) > MAX_CLIPS:
+            timestamps = await self._rank_clips(timestamps, condensed, user_prompt)
+        
+        logger.info("GPT Analysis - Extracted %d timestamp ranges", len(timestamps))
+        for i, ts in enumerate(timestamps):
+            logger.debug("  Clip %d: %.1fs - %.1fs (duration: %.1fs)", i + 1, ts['start'], ts['end'], ts['end'] - ts['start'])
+        
+        # An empty pick fails the job, so a retry should ask GPT again rather than
+        # replay it from the cache
+        if timestamps:
+            _cache.set("clips", cache_key, timestamps, ttl=CLIPS_CACHE_TTL)
+        return timestamps
+    
+    @staticmethod
+    def _split_transcript(transcript: List[Tuple[str, float, float]]) -> List[List[Tuple[str, float, float]]]:
+        """Split the transcript into overlapping windows of segments"""
+        if len(transcript) <= TRANSCRIPT_WINDOW_SEGMENTS:
+            return [transcript]
+        step = TRANSCRIPT_WINDOW_SEGMENTS - TRANSCRIPT_WINDOW_OVERLAP
+        return [
+            transcript[i:i + TRANSCRIPT_WINDOW_SEGMENTS]
+            for i in range(0, len(transcript) - TRANSCRIPT_WINDOW_OVERLAP, step)
+        ]
+    
+    async def _request_clips(self, window: List[Tuple[str, float, float]], user_prompt: str) -> List[Dict[str, float]]:
+        """Ask GPT for the relevant time intervals in one transcript window"""
+        prompt = f"""
+        Here is the transcript of the video:
+{_format_transcript(window)}
         
-        # Run GPT processing in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, process_with_gpt)
+        Instructions: {user_prompt}
+        
+        Please identify the most relevant time intervals in the video based on the instructions.
+        """
+        
+        logger.debug("Starting GPT API call")
+        content = await self._complete(_CLIP_SYSTEM_PROMPT, prompt)
+        logger.debug("GPT response: %s", content)
+        return _clean_clips(orjson.loads(content)["clips"])
+    
+    async def _rank_clips(self, timestamps: List[Dict[str, float]], transcript: List[Tuple[str, float, float]],
+                          user_prompt: str) -> List[Dict[str, float]]:
+        """Ask GPT to keep only the best candidates when the windows returned too many clips"""
+        segment_ends = [end for _, _, end in transcript]
+        candidates = [
+            {
+                "start": ts["start"],
+                "end": ts["end"],
+                "text": _transcript_excerpt(transcript, segment_ends, ts["start"], ts["end"])
+            }
+            for ts in timestamps
+        ]
+        prompt = f"""
+        Here are candidate clips from the video: {orjson.dumps(candidates).decode()}
+        
+        Instructions: {user_prompt}
+        
+        Please keep at most {MAX_CLIPS} of these clips that best match the instructions, unchanged.
+        """
+        
+        logger.debug("Starting GPT ranking call for %d candidate clips", len(candidates))
+        content = await self._complete(_CLIP_SYSTEM_PROMPT, prompt)
+        logger.debug("GPT response: %s", content)
+        # The model does not always respect the limit it is given; cap before merging,
+        # which sorts by time, so the clips it listed first are the ones kept
+        return _merge_intervals(_clean_clips(orjson.loads(content)["clips"])[:MAX_CLIPS], gap=CLIP_MERGE_GAP)
+    
+    async def _complete(self, system_prompt: str, prompt: str) -> str:
+        """Run a structured-output chat completion and return the message content"""
+        completion = await self._openai.chat.completions.create(
+            model=CLIP_MODEL,
+            response_format=_CLIP_RESPONSE_FORMAT,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        )
+        return completion.choices[0].message.content
     
     async def _render_video(self, video_path: str, timestamps: List[Dict[str, float]]) -> List[Dict[str, Any]]:
-        """Render the final video with identified clips using ffmpeg for fast stitching"""
-        def render():
-            print(f"Starting video rendering for {len(timestamps)} clips...", flush=True)
-            clips_info = []
-            temp_clips = []
-            concat_list_path = self.temp_dir / "concat_list.txt"
-            video_duration = None
-
-            # Get video duration using ffprobe
+        """Render the final video with identified clips using ffmpeg stream copy for fast stitching"""
+        logger.debug("Starting video rendering for %d clips", len(timestamps))
+
+        # Use the duration yt-dlp reported and only probe the file when there was no
+        # download this job (e.g. a cached video); without a probe, audio is assumed and
+        # a failed single-pass render falls back to per-clip cuts
+        video_duration = self.video_duration
+        has_audio = True
+        if video_duration is None:
             try:
-                import json
-                result = subprocess.run([
-                    "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", str(video_path)
-                ], capture_output=True, text=True)
-                video_duration = float(json.loads(result.stdout)["format"]["duration"])
+                proc = await asyncio.create_subprocess_exec(
+                    FFPROBE, "-v", "error", "-show_entries", "format=duration:stream=codec_type",
+                    "-of", "json", str(video_path),
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await proc.communicate()
+                probe = orjson.loads(stdout)
+                video_duration = float(probe["format"]["duration"])
+                has_audio = any(stream.get("codec_type") == "audio" for stream in probe.get("streams", []))
             except Exception:
                 video_duration = None
 
-            for i, timestamp in enumerate(timestamps):
-                start_time = max(0, timestamp['start'])
-                end_time = min(timestamp['end'], video_duration) if video_duration else timestamp['end']
-                if end_time <= start_time:
-                    continue  # skip invalid clips
-                out_clip = self.temp_dir / f"clip_{i+1}.mp4"
-                temp_clips.append(out_clip)
-                # ffmpeg command to extract subclip
-                cmd = [
-                    "ffmpeg", "-y", "-i", str(video_path),
-                    "-ss", str(start_time), "-to", str(end_time),
-                    "-avoid_negative_ts", "make_zero", str(out_clip)
+        clips = []
+        for i, timestamp in enumerate(timestamps):
+            start_time = max(0, timestamp['start'])
+            end_time = min(timestamp['end'], video_duration) if video_duration else timestamp['end']
+            if end_time <= start_time:
+                continue  # skip invalid clips
+            clips.append((self.temp_dir / f"clip_{i+1}.mp4", start_time, end_time))
+
+        # Re-encode clips concurrently; the semaphore keeps disk and CPU from thrashing
+        semaphore = asyncio.Semaphore(min(os.cpu_count() or 1, 8))
+
+        keyframes = await self._probe_keyframes(video_path, [start_time for _, start_time, _ in clips])
+
+        def copy_start_for(start_time: float) -> Optional[float]:
+            # Stream copy can only start on a keyframe; snap back to it when it is
+            # close enough, otherwise the clip needs a re-encode for a frame-accurate start
+            if not keyframes:
+                return start_time
+            index = bisect.bisect_right(keyframes, start_time) - 1
+            if index >= 0 and start_time - keyframes[index] <= KEYFRAME_SNAP_TOLERANCE:
+                return keyframes[index]
+            return None
+
+        async def encode_clip(out_clip: Path, start_time: float, end_time: float):
+            async with semaphore:
+                encoder_args = await self._get_encoder_args()
+                encode_args = [
+                    "-ss", str(start_time), "-i", str(video_path),
+                    "-t", str(end_time - start_time), *_clip_stream_map(), *encoder_args, str(out_clip)
                 ]
-                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                clips_info.append({
-                    "id": str(i + 1),
-                    "title": f"Clip {i + 1}",
-                    "duration": f"{end_time - start_time:.1f}s",
-                    "timeframe": f"{start_time:.1f}s - {end_time:.1f}s",
-                    "start": start_time,
-                    "end": end_time
-                })
-
-            # Write concat list file
-            with open(concat_list_path, "w") as f:
-                for clip_path in temp_clips:
-                    f.write(f"file '{clip_path}'\n")
-
-            # ffmpeg concat command
-            concat_cmd = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list_path),
-                "-c", "copy", str(self.output_path)
+                # Hardware decoders can fail to initialise (e.g. out of GPU memory),
+                # so fall back to software decode for this clip
+                if self._hwaccel_args and await self._run_ffmpeg("-y", *self._hwaccel_args, *encode_args) == 0:
+                    return
+                await self._run_ffmpeg("-y", *encode_args)
+
+        # The copy-only concat can only join streams with identical codecs and
+        # parameters, and ffmpeg exits 0 even when it writes a broken file from mixed
+        # inputs. So clips are either all copied from the source or all re-encoded,
+        # never a mix of the two
+        copy_starts = [copy_start_for(start_time) for _, start_time, _ in clips]
+        if clips and all(copy_start is not None for copy_start in copy_starts):
+            # Keyframe-aligned clips need no cutting at all: the concat demuxer reads
+            # them straight from the source between an inpoint and outpoint
+            sources = [
+                (Path(video_path), copy_start, end_time)
+                for (_, _, end_time), copy_start in zip(clips, copy_starts)
             ]
-            subprocess.run(concat_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-            # Optionally, cleanup temp clips (but not self.output_path)
-            for clip_path in temp_clips:
-                if clip_path.exists():
-                    try:
-                        os.remove(clip_path)
-                    except Exception:
-                        pass
-            if concat_list_path.exists():
-                try:
-                    os.remove(concat_list_path)
-                except Exception:
-                    pass
+            clips_info = await self._concat_clips(clips, sources)
+            if self.render_path.exists():
+                return clips_info
+            logger.warning("Concat from source failed, re-encoding all clips")
+        elif await self._render_filtered(video_path, clips, has_audio):
+            # Trim and join every clip in one ffmpeg pass instead of writing and
+            # re-reading a temp file per clip
+            return self._describe_clips(clips)
+
+        await asyncio.gather(*(encode_clip(*clip) for clip in clips))
+        return await self._concat_clips(clips)
+
+    async def _render_filtered(self, video_path: str, clips: List[Tuple[Path, float, float]], has_audio: bool) -> bool:
+        """Cut every clip and join them with a single filter_complex encode; return True on success"""
+        # Each clip is its own input seeked with -ss before -i, so ffmpeg jumps
+        # straight to the clip instead of decoding everything before it
+        inputs = []
+        streams = []
+        for i, (_, start_time, end_time) in enumerate(clips):
+            inputs += ["-ss", str(start_time), "-t", str(end_time - start_time), "-i", str(video_path)]
+            streams.append(f"[{i}:v:0]" + (f"[{i}:a:0]" if has_audio else ""))
+        concat = f"{''.join(streams)}concat=n={len(clips)}:v=1:a={int(has_audio)}[v]" + ("[a]" if has_audio else "")
+
+        maps = ["-map", "[v]"] + (["-map", "[a]"] if has_audio else [])
+        encoder_args = await self._get_encoder_args()
+        returncode = await self._run_ffmpeg(
+            "-y", *inputs, "-filter_complex", concat,
+            *maps, *encoder_args, *FASTSTART, str(self.render_path)
+        )
+        return returncode == 0 and self.render_path.exists()
+
+    @staticmethod
+    def _describe_clips(clips: List[Tuple[Path, float, float]]) -> List[Dict[str, Any]]:
+        """Build the clip summaries returned to the client"""
+        clips_info = []
+        for i, (_, start_time, end_time) in enumerate(clips):
+            clips_info.append({
+                "id": str(i + 1),
+                "title": f"Clip {i + 1}",
+                "duration": f"{end_time - start_time:.1f}s",
+                "timeframe": f"{start_time:.1f}s - {end_time:.1f}s",
+                "start": start_time,
+                "end": end_time
+            })
+        return clips_info
 
-            return clips_info
+    async def _concat_clips(self, clips: List[Tuple[Path, float, float]],
+                            sources: Optional[List[Tuple[Path, Optional[float], Optional[float]]]] = None) -> List[Dict[str, Any]]:
+        """Stitch clips into the final video with the concat demuxer and describe each clip.
+        Each clip is read from its own file, or from a (file, inpoint, outpoint) entry in sources"""
+        clips_info = self._describe_clips(clips)
+        if sources is None:
+            sources = [(clip_path, None, None) for clip_path, _, _ in clips]
 
-        # Run rendering in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, render)
+        # Build the concat list in memory and pipe it to ffmpeg; paths must be
+        # absolute since there is no list file to resolve them against
+        lines = []
+        for source_path, inpoint, outpoint in sources:
+            escaped_path = str(Path(source_path).resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped_path}'")
+            if inpoint is not None:
+                lines.append(f"inpoint {inpoint}\noutpoint {outpoint}")
+        concat_list = ("\n".join(lines) + "\n").encode()
+
+        # ffmpeg concat command; faststart puts the index up front so browsers can
+        # start playback before the whole file arrives. Stream copy is just demuxing
+        # and muxing, so one thread is enough and leaves cores to concurrent jobs.
+        # Never leave a partial output behind
+        returncode = await self._run_ffmpeg(
+            "-y", "-threads", "1", "-f", "concat", "-safe", "0", "-protocol_whitelist", "pipe,file", "-i", "pipe:0",
+            "-c", "copy", *FASTSTART, str(self.render_path),
+            input=concat_list
+        )
+        if returncode != 0:
+            self.render_path.unlink(missing_ok=True)
+
+        # Clean up temp clips (but not self.render_path)
+        for clip_path, _, _ in clips:
+            try:
+                os.remove(clip_path)
+            except OSError:
+                pass
+
+        return clips_info
+
+    async def _probe_keyframes(self, video_path: str, starts: List[float]) -> List[float]:
+        """Get the sorted keyframe timestamps of the video stream near the given clip starts,
+        or [] if probing fails"""
+        # Only the snap window before each start matters, so seek there instead of
+        # reading every packet of the file
+        read_intervals = ",".join(
+            f"{max(0.0, start - KEYFRAME_SNAP_TOLERANCE)}%{start + 0.001}" for start in sorted(starts)
+        )
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                FFPROBE, "-v", "error", "-select_streams", "v:0", "-read_intervals", read_intervals,
+                "-show_entries", "packet=pts_time,flags", "-of", "csv=print_section=0", str(video_path),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+        except Exception:
+            return []
+        
+        keyframes = []
+        for line in stdout.decode().splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        keyframes.sort()
+        return keyframes
+    
+    @classmethod
+    async def _get_encoder_args(cls) -> List[str]:
+        """Get ffmpeg encoding args for the fastest working H.264 encoder, probed once per process"""
+        if cls._encoder_args is None:
+            cls._encoder_args, cls._hwaccel_args = await cls._probe_encoder_args()
+        return cls._encoder_args
+    
+    @staticmethod
+    async def _probe_encoder_args() -> Tuple[List[str], List[str]]:
+        """Find the first hardware H.264 encoder that can actually encode a test frame,
+        returning its encoding args and matching hardware decode args"""
+        for encoder, args, hwaccel_args in HW_H264_ENCODERS:
+            proc = await asyncio.create_subprocess_exec(
+                FFMPEG, "-hide_banner", "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                "-c:v", encoder, "-f", "null", "-",
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            if await proc.wait() == 0:
+                logger.info("Using hardware encoder %s for re-encoded clips", encoder)
+                return ["-c:v", encoder, *args, "-c:a", "aac", "-b:a", "128k"], hwaccel_args
+        
+        logger.info("No hardware encoder available, using libx264 for re-encoded clips")
+        return ["-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", "-b:a", "128k"], []
+    
+    async def _run_ffmpeg(self, *args: str, input: Optional[bytes] = None) -> int:
+        """Run ffmpeg as an asyncio subprocess, optionally feeding it stdin, and return its exit code"""
+        proc = await asyncio.create_subprocess_exec(
+            FFMPEG, *args,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        await proc.communicate(input)
+        return proc.returncode
+    
+    def _publish_output(self):
+        """Move the rendered video into storage atomically"""
+        try:
+            os.replace(self.render_path, self.output_path)
+        except OSError:
+            # Temp and storage are on different filesystems: copy next to the
+            # destination first so the final rename is still atomic
+            partial_path = self.output_path.with_suffix(".part")
+            shutil.copyfile(self.render_path, partial_path)
+            os.replace(partial_path, self.output_path)
     
     def _cleanup_temp_files(self):
         """Clean up temporary files"""
-        try:
-            if self.temp_dir.exists():
-                import shutil
-                shutil.rmtree(self.temp_dir)
-        except Exception as e:
-            print(f"Warning: Could not clean up temp files: {e}")
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
     
-    def get_video_info(self) -> Dict[str, Any]:
+    async def get_video_info(self) -> Dict[str, Any]:
         """Get information about the processed video"""
         if not self.output_path.exists():
             return {}
         
         try:
-            with VideoFileClip(str(self.output_path)) as clip:
-                return {
-                    "duration": clip.duration,
-                    "fps": clip.fps,
-                    "size": (clip.w, clip.h),
-                    "file_size": self.output_path.stat().st_size
-                }
+            proc = await asyncio.create_subprocess_exec(
+                FFPROBE, "-v", "error", "-print_format", "json", "-show_format", "-show_streams",
+                str(self.output_path),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+            probe = orjson.loads(stdout)
+            video = next(stream for stream in probe["streams"] if stream.get("codec_type") == "video")
+            frames, seconds = video.get("avg_frame_rate", "0/1").split("/")
+            return {
+                "duration": float(probe["format"]["duration"]),
+                "fps": float(frames) / float(seconds) if float(seconds) else 0.0,
+                "size": (video["width"], video["height"]),
+                "file_size": self.output_path.stat().st_size
+            }
         except Exception:
             return {} 
  
\ No newline at end of file
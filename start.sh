@@ -3,7 +3,7 @@
 # Start the backend server
 echo "Starting ClipWave AI Backend..."
 cd backend
-python -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload &
+python -m uvicorn main:app --host 0.0.0.0 --port 8000 --ws-ping-interval 20 --ws-ping-timeout 20 --reload &
 BACKEND_PID=$!
 
 # Wait a moment for backend to start
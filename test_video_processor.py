@@ -11,7 +11,7 @@ from pathlib import Path
 # Add the backend directory to the Python path
 sys.path.append(str(Path(__file__).parent / "backend"))
 
-from video_processor import VideoProcessor
+from video_processor import VideoProcessor, _condense_transcript
 
 async def test_video_processing():
     """Test the video processing functionality"""
@@ -64,6 +64,22 @@ async def test_video_processing():
         import traceback
         traceback.print_exc()
 
+def test_condense_transcript_non_speech():
+    """Annotation-only segments are dropped, while segments with a word after long
+    runs of spaces or annotations (which used to backtrack exponentially) are kept"""
+    transcript = [
+        ("[Music]", 0.0, 2.0),
+        ("♪ ♪", 2.0, 4.0),
+        ("(applause) ...", 4.0, 6.0),
+        (" " * 5000 + "yes", 6.0, 8.0),
+        (". " * 5000 + "yes", 8.0, 10.0),
+        ("[Music] " * 5000 + "yes", 10.0, 12.0),
+    ]
+    
+    condensed = _condense_transcript(transcript, "")
+    assert [start for _, start, _ in condensed] == [6.0, 8.0, 10.0]
+
 if __name__ == "__main__":
-    # Run the test
+    # Run the tests
+    test_condense_transcript_non_speech()
     asyncio.run(test_video_processing()) 
\ No newline at end of file